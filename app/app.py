@@ -1,3 +1,5 @@
+import os
+from datetime import timedelta
 import streamlit as st
 import psycopg2
 import pandas as pd
@@ -8,12 +10,13 @@ import plotly.express as px
 def init_connection():
     try:
         # Pass PostgreSQL credentials directly to psycopg2.connect
+        # (the TELLCO_DB_* environment variables override them, e.g. for load testing)
         return psycopg2.connect(
-            dbname="tellco_db",
-            user="zola",
-            password="LIZR7XwHKEkt05LFV0x9KTZhhPLDtVmv",
-            host="dpg-crfm21o8fa8c73d8chh0-a.oregon-postgres.render.com",
-            port="5432"
+            dbname=os.environ.get("TELLCO_DB_NAME", "tellco_db"),
+            user=os.environ.get("TELLCO_DB_USER", "zola"),
+            password=os.environ.get("TELLCO_DB_PASSWORD", "LIZR7XwHKEkt05LFV0x9KTZhhPLDtVmv"),
+            host=os.environ.get("TELLCO_DB_HOST", "dpg-crfm21o8fa8c73d8chh0-a.oregon-postgres.render.com"),
+            port=os.environ.get("TELLCO_DB_PORT", "5432")
         )
     except Exception as e:
         st.error(f"Error connecting to PostgreSQL database: {e}")
@@ -23,13 +26,13 @@ conn = init_connection()
 
 # Perform query
 @st.cache_data(ttl=600)
-def run_query(query):
+def run_query(query, params=None):
     if conn is None:
         st.error("Failed to establish database connection.")
         return None  # Return None if connection is not established
     try:
         with conn.cursor() as cur:
-            cur.execute(query)
+            cur.execute(query, params)
             return cur.fetchall()
     except Exception as e:
         st.error(f"Error executing query: {e}")
@@ -40,13 +43,32 @@ st.sidebar.title('Analysis Sections')
 analysis_sections = ['User Overview Analysis', 'User Engagement Analysis', 'User Experience Analysis', 'User Satisfaction Analysis']
 selected_section = st.sidebar.selectbox("Select Analysis Section:", analysis_sections)
 
+# Date range filter on the record start date, passed to every query so Postgres only
+# scans the xdr_data partitions covering the selected range
+date_bounds = run_query("SELECT MIN(\"Start\")::date, MAX(\"Start\")::date FROM xdr_data")
+if not date_bounds or date_bounds[0][0] is None:
+    st.error("Failed to fetch the available date range.")
+    st.stop()
+min_date, max_date = date_bounds[0]
+selected_dates = st.sidebar.date_input(
+    "Select Date Range:",
+    value=(max(min_date, max_date - timedelta(days=6)), max_date),
+    min_value=min_date,
+    max_value=max_date
+)
+if len(selected_dates) != 2:
+    st.info("Select an end date to run the analysis.")
+    st.stop()
+# End date is inclusive in the selector, exclusive in the queries
+date_range = {'start': selected_dates[0], 'end': selected_dates[1] + timedelta(days=1)}
+
 # User Overview Analysis
 if selected_section == 'User Overview Analysis':
     st.header("User Overview Analysis")
 
     # Top handsets
-    query_top_handsets = "SELECT \"Handset Type\", COUNT(*) AS \"Count\" FROM xdr_data GROUP BY \"Handset Type\" ORDER BY \"Count\" DESC LIMIT 10"
-    top_handsets = run_query(query_top_handsets)
+    query_top_handsets = "SELECT \"Handset Type\", COUNT(*) AS \"Count\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"Handset Type\" ORDER BY \"Count\" DESC LIMIT 10"
+    top_handsets = run_query(query_top_handsets, date_range)
 
     if top_handsets is not None:
         top_handsets_df = pd.DataFrame(top_handsets, columns=['Handset Type', 'Count'])
@@ -56,8 +78,8 @@ if selected_section == 'User Overview Analysis':
         st.error("Failed to fetch top handsets data.")
 
     # Top handsets by manufacturers
-    query_top_manufacturers = "SELECT \"Handset Manufacturer\", COUNT(*) AS \"Count\" FROM xdr_data GROUP BY \"Handset Manufacturer\" ORDER BY \"Count\" DESC LIMIT 10"
-    top_manufacturers = run_query(query_top_manufacturers)
+    query_top_manufacturers = "SELECT \"Handset Manufacturer\", COUNT(*) AS \"Count\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"Handset Manufacturer\" ORDER BY \"Count\" DESC LIMIT 10"
+    top_manufacturers = run_query(query_top_manufacturers, date_range)
 
     if top_manufacturers is not None:
         top_manufacturers_df = pd.DataFrame(top_manufacturers, columns=['Handset Manufacturer', 'Count'])
@@ -67,8 +89,8 @@ if selected_section == 'User Overview Analysis':
         st.error("Failed to fetch top handset manufacturers data.")
 
     # Users with the top number of sessions
-    query_top_sessions = "SELECT \"MSISDN/Number\", COUNT(*) AS \"Session Count\" FROM xdr_data GROUP BY \"MSISDN/Number\" ORDER BY \"Session Count\" DESC LIMIT 10"
-    top_sessions = run_query(query_top_sessions)
+    query_top_sessions = "SELECT \"MSISDN/Number\", COUNT(*) AS \"Session Count\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"MSISDN/Number\" ORDER BY \"Session Count\" DESC LIMIT 10"
+    top_sessions = run_query(query_top_sessions, date_range)
 
     if top_sessions is not None:
         top_sessions_df = pd.DataFrame(top_sessions, columns=['MSISDN/Number', 'Session Count'])
@@ -78,8 +100,8 @@ if selected_section == 'User Overview Analysis':
         st.error("Failed to fetch top sessions data.")
 
     # Top total duration of sessions
-    query_top_duration = "SELECT \"MSISDN/Number\", SUM(\"Dur. (ms)\") AS \"Total Duration\" FROM xdr_data GROUP BY \"MSISDN/Number\" ORDER BY \"Total Duration\" DESC LIMIT 10"
-    top_duration = run_query(query_top_duration)
+    query_top_duration = "SELECT \"MSISDN/Number\", SUM(\"Dur. (ms)\") AS \"Total Duration\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"MSISDN/Number\" ORDER BY \"Total Duration\" DESC LIMIT 10"
+    top_duration = run_query(query_top_duration, date_range)
 
     if top_duration is not None:
         top_duration_df = pd.DataFrame(top_duration, columns=['MSISDN/Number', 'Total Duration'])
@@ -89,8 +111,8 @@ if selected_section == 'User Overview Analysis':
         st.error("Failed to fetch top duration data.")
 
     # Top average duration of sessions
-    query_top_avg_duration = "SELECT \"MSISDN/Number\", AVG(\"Dur. (ms)\") AS \"Average Duration\" FROM xdr_data GROUP BY \"MSISDN/Number\" ORDER BY \"Average Duration\" DESC LIMIT 10"
-    top_avg_duration = run_query(query_top_avg_duration)
+    query_top_avg_duration = "SELECT \"MSISDN/Number\", AVG(\"Dur. (ms)\") AS \"Average Duration\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"MSISDN/Number\" ORDER BY \"Average Duration\" DESC LIMIT 10"
+    top_avg_duration = run_query(query_top_avg_duration, date_range)
 
     if top_avg_duration is not None:
         top_avg_duration_df = pd.DataFrame(top_avg_duration, columns=['MSISDN/Number', 'Average Duration'])
@@ -100,8 +122,8 @@ if selected_section == 'User Overview Analysis':
         st.error("Failed to fetch top average duration data.")
 
     # Users with the top total data used
-    query_top_data = "SELECT \"MSISDN/Number\", SUM(\"Total DL (Bytes)\") + SUM(\"Total UL (Bytes)\") AS \"Total Data Used\" FROM xdr_data GROUP BY \"MSISDN/Number\" ORDER BY \"Total Data Used\" DESC LIMIT 10"
-    top_data = run_query(query_top_data)
+    query_top_data = "SELECT \"MSISDN/Number\", SUM(\"Total DL (Bytes)\") + SUM(\"Total UL (Bytes)\") AS \"Total Data Used\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"MSISDN/Number\" ORDER BY \"Total Data Used\" DESC LIMIT 10"
+    top_data = run_query(query_top_data, date_range)
 
     if top_data is not None:
         top_data_df = pd.DataFrame(top_data, columns=['MSISDN/Number','Total Data Used'])
@@ -118,15 +140,15 @@ elif selected_section == 'User Engagement Analysis':
     selected_engagement_metric = st.selectbox("Select an engagement metric:", engagement_metrics)
 
     if selected_engagement_metric == 'Number of Sessions':
-        query_engagement = "SELECT \"MSISDN/Number\", COUNT(*) AS \"Session Count\" FROM xdr_data GROUP BY \"MSISDN/Number\" ORDER BY \"Session Count\" DESC LIMIT 10"
+        query_engagement = "SELECT \"MSISDN/Number\", COUNT(*) AS \"Session Count\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"MSISDN/Number\" ORDER BY \"Session Count\" DESC LIMIT 10"
     elif selected_engagement_metric == 'Total Duration':
-        query_engagement = "SELECT \"MSISDN/Number\", SUM(\"Dur. (ms)\") AS \"Total Duration\" FROM xdr_data GROUP BY \"MSISDN/Number\" ORDER BY \"Total Duration\" DESC LIMIT 10"
+        query_engagement = "SELECT \"MSISDN/Number\", SUM(\"Dur. (ms)\") AS \"Total Duration\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"MSISDN/Number\" ORDER BY \"Total Duration\" DESC LIMIT 10"
     elif selected_engagement_metric == 'Total Data Volume':
-        query_engagement = "SELECT \"MSISDN/Number\", SUM(\"Total DL (Bytes)\") + SUM(\"Total UL (Bytes)\") AS \"Total Data Volume\" FROM xdr_data GROUP BY \"MSISDN/Number\" ORDER BY \"Total Data Volume\" DESC LIMIT 10"
+        query_engagement = "SELECT \"MSISDN/Number\", SUM(\"Total DL (Bytes)\") + SUM(\"Total UL (Bytes)\") AS \"Total Data Volume\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"MSISDN/Number\" ORDER BY \"Total Data Volume\" DESC LIMIT 10"
     else:
         st.error("Invalid engagement metric selected.")
 
-    engagement_data = run_query(query_engagement)
+    engagement_data = run_query(query_engagement, date_range)
 
     if engagement_data is not None:
         engagement_df = pd.DataFrame(engagement_data, columns=['MSISDN/Number', selected_engagement_metric])
@@ -143,17 +165,17 @@ elif selected_section == 'User Experience Analysis':
     selected_experience_metric = st.selectbox("Select an experience metric:", experience_metrics)
 
     if selected_experience_metric == 'Avg RTT DL':
-        query_experience = "SELECT \"MSISDN/Number\", \"Avg RTT DL (ms)\" AS \"Average RTT DL\" FROM xdr_data ORDER BY \"Average RTT DL\" DESC LIMIT 10"
+        query_experience = "SELECT \"MSISDN/Number\", \"Avg RTT DL (ms)\" AS \"Average RTT DL\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s ORDER BY \"Average RTT DL\" DESC LIMIT 10"
     elif selected_experience_metric == 'Avg RTT UL':
-        query_experience = "SELECT \"MSISDN/Number\", \"Avg RTT UL (ms)\" AS \"Average RTT UL\" FROM xdr_data ORDER BY \"Average RTT UL\" DESC LIMIT 10"
+        query_experience = "SELECT \"MSISDN/Number\", \"Avg RTT UL (ms)\" AS \"Average RTT UL\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s ORDER BY \"Average RTT UL\" DESC LIMIT 10"
     elif selected_experience_metric == 'Avg Bearer TP DL':
-        query_experience = "SELECT \"MSISDN/Number\", \"Avg Bearer TP DL (kbps)\" AS \"Average Bearer TP DL\" FROM xdr_data ORDER BY \"Average Bearer TP DL\" DESC LIMIT 10"
+        query_experience = "SELECT \"MSISDN/Number\", \"Avg Bearer TP DL (kbps)\" AS \"Average Bearer TP DL\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s ORDER BY \"Average Bearer TP DL\" DESC LIMIT 10"
     elif selected_experience_metric == 'Avg Bearer TP UL':
-        query_experience = "SELECT \"MSISDN/Number\", \"Avg Bearer TP UL (kbps)\" AS \"Average Bearer TP UL\" FROM xdr_data ORDER BY \"Average Bearer TP UL\" DESC LIMIT 10"
+        query_experience = "SELECT \"MSISDN/Number\", \"Avg Bearer TP UL (kbps)\" AS \"Average Bearer TP UL\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s ORDER BY \"Average Bearer TP UL\" DESC LIMIT 10"
     else:
         st.error("Invalid experience metric selected.")
 
-    experience_data = run_query(query_experience)
+    experience_data = run_query(query_experience, date_range)
 
     if experience_data is not None:
         experience_df = pd.DataFrame(experience_data, columns=['MSISDN/Number', selected_experience_metric])
@@ -170,13 +192,13 @@ elif selected_section == 'User Satisfaction Analysis':
     selected_satisfaction_metric = st.selectbox("Select a satisfaction metric:", satisfaction_metrics)
 
     if selected_satisfaction_metric == 'Engagement Score':
-        query_satisfaction = "SELECT \"MSISDN/Number\", COUNT(*) AS \"Engagement Score\" FROM xdr_data GROUP BY \"MSISDN/Number\" ORDER BY \"Engagement Score\" DESC LIMIT 10"
+        query_satisfaction = "SELECT \"MSISDN/Number\", COUNT(*) AS \"Engagement Score\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s GROUP BY \"MSISDN/Number\" ORDER BY \"Engagement Score\" DESC LIMIT 10"
     elif selected_satisfaction_metric == 'Experience Score':
-        query_satisfaction = "SELECT \"MSISDN/Number\", \"Avg RTT DL (ms)\" + \"Avg RTT UL (ms)\" + \"Avg Bearer TP DL (kbps)\" + \"Avg Bearer TP UL (kbps)\" AS \"Experience Score\" FROM xdr_data ORDER BY \"Experience Score\" DESC LIMIT 10"
+        query_satisfaction = "SELECT \"MSISDN/Number\", \"Avg RTT DL (ms)\" + \"Avg RTT UL (ms)\" + \"Avg Bearer TP DL (kbps)\" + \"Avg Bearer TP UL (kbps)\" AS \"Experience Score\" FROM xdr_data WHERE \"Start\" >= %(start)s AND \"Start\" < %(end)s ORDER BY \"Experience Score\" DESC LIMIT 10"
     else:
         st.error("Invalid satisfaction metric selected.")
 
-    satisfaction_data = run_query(query_satisfaction)
+    satisfaction_data = run_query(query_satisfaction, date_range)
 
     if satisfaction_data is not None:
         satisfaction_df = pd.DataFrame(satisfaction_data, columns=['MSISDN/Number', selected_satisfaction_metric])
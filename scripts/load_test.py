@@ -0,0 +1,471 @@
+# load_test.py
+
+import argparse
+import asyncio
+import os
+import random
+import runpy
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import psycopg2
+import psycopg2.extensions
+import streamlit as st
+import websockets
+from psycopg2.extras import execute_values
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from scripts.xdr_partitions import create_partition, months_between, prepare_partitioned_table
+
+APP_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app', 'app.py'))
+
+# Streamlit entry point that runs the app and reports the queries of each script run
+INSTRUMENTED_APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load_test_app.py')
+
+SECTION_LABEL = "Select Analysis Section:"
+
+# Analysis sections of the dashboard and the label/options of their metric selectbox
+SECTIONS = {
+    'User Overview Analysis': (None, [None]),
+    'User Engagement Analysis': ("Select an engagement metric:",
+                                 ['Number of Sessions', 'Total Duration', 'Total Data Volume']),
+    'User Experience Analysis': ("Select an experience metric:",
+                                 ['Avg RTT DL', 'Avg RTT UL', 'Avg Bearer TP DL', 'Avg Bearer TP UL']),
+    'User Satisfaction Analysis': ("Select a satisfaction metric:",
+                                   ['Engagement Score', 'Experience Score']),
+}
+
+# Caption written after every script run by run_instrumented_app
+QUERY_COUNT_PREFIX = "load-test queries: "
+
+_query_counter = threading.local()
+
+
+def seed_xdr_data(db_config, rows=100_000, users=10_000, days=30, seed=42, batch_size=10_000):
+    """
+    Create the xdr_data table, partitioned by month of record start date, in a local
+    Postgres database and fill it with synthetic rows.
+
+    Parameters:
+    db_config (dict): Connection parameters (host, port, user, password, database)
+    rows (int): Number of sessions to generate
+    users (int): Number of distinct MSISDN numbers
+    days (int): Number of days of history the sessions are spread over
+    seed (int): Random seed
+    batch_size (int): Number of rows inserted per statement
+    """
+    rng = np.random.default_rng(seed)
+    manufacturers = ['Apple', 'Samsung', 'Huawei', 'Sony Mobile Communications Ab', 'Xiaomi']
+    handsets = [f"{m} Model {i}" for m in manufacturers for i in range(10)]
+
+    db_connection = psycopg2.connect(
+        host=db_config['host'],
+        port=db_config['port'],
+        user=db_config['user'],
+        password=db_config['password'],
+        dbname=db_config['database']
+    )
+    cursor = db_connection.cursor()
+    cursor.execute("DROP TABLE IF EXISTS xdr_data")
+    cursor.execute("""
+    CREATE TABLE xdr_data (
+        "Start" TIMESTAMP,
+        "MSISDN/Number" DOUBLE PRECISION,
+        "Handset Manufacturer" TEXT,
+        "Handset Type" TEXT,
+        "Dur. (ms)" DOUBLE PRECISION,
+        "Avg RTT DL (ms)" DOUBLE PRECISION,
+        "Avg RTT UL (ms)" DOUBLE PRECISION,
+        "Avg Bearer TP DL (kbps)" DOUBLE PRECISION,
+        "Avg Bearer TP UL (kbps)" DOUBLE PRECISION,
+        "Total DL (Bytes)" DOUBLE PRECISION,
+        "Total UL (Bytes)" DOUBLE PRECISION
+    ) PARTITION BY RANGE ("Start")
+    """)
+    prepare_partitioned_table(cursor)
+
+    start = np.datetime64('2019-04-01T00:00:00')
+    first_day = start.astype('datetime64[D]').item()
+    last_day = (start + np.timedelta64(days - 1, 'D')).astype('datetime64[D]').item()
+    for month in months_between(first_day, last_day):
+        create_partition(cursor, month)
+
+    for offset in range(0, rows, batch_size):
+        n = min(batch_size, rows - offset)
+        handset_idx = rng.integers(0, len(handsets), n)
+        batch = zip(
+            (start + rng.integers(0, days * 24 * 3600, n).astype('timedelta64[s]')).tolist(),
+            (33_600_000_000 + rng.integers(0, users, n)).astype(float).tolist(),
+            [handsets[i].split(' Model')[0] for i in handset_idx],
+            [handsets[i] for i in handset_idx],
+            rng.exponential(100_000, n).tolist(),
+            rng.exponential(100, n).tolist(),
+            rng.exponential(20, n).tolist(),
+            rng.exponential(10_000, n).tolist(),
+            rng.exponential(1_000, n).tolist(),
+            rng.exponential(500_000_000, n).tolist(),
+            rng.exponential(40_000_000, n).tolist(),
+        )
+        execute_values(cursor, "INSERT INTO xdr_data VALUES %s", list(batch))
+
+    db_connection.commit()
+    cursor.close()
+    db_connection.close()
+    print(f"Seeded xdr_data with {rows} rows.")
+
+
+
+class CountingCursor(psycopg2.extensions.cursor):
+    """Cursor counting the queries executed by the current script run thread."""
+
+    def execute(self, query, vars=None):
+        _query_counter.count = getattr(_query_counter, 'count', 0) + 1
+        return super().execute(query, vars)
+
+
+def run_instrumented_app(app_path):
+    """
+    Run a Streamlit app script and write the number of queries it executed as a caption.
+
+    Called from load_test_app.py inside the Streamlit server. Connections opened through
+    psycopg2.connect use CountingCursor, and queries served from st.cache_data are not
+    executed, so the count tells the load test whether a page view hit the cache.
+
+    Parameters:
+    app_path (str): Path of the app script
+    """
+    if not getattr(psycopg2.connect, 'counts_queries', False):
+        connect = psycopg2.connect
+
+        def counting_connect(*args, **kwargs):
+            kwargs.setdefault('cursor_factory', CountingCursor)
+            return connect(*args, **kwargs)
+
+        counting_connect.counts_queries = True
+        psycopg2.connect = counting_connect
+
+    _query_counter.count = 0
+    try:
+        runpy.run_path(app_path, run_name='__main__')
+    finally:
+        st.caption(f"{QUERY_COUNT_PREFIX}{_query_counter.count}")
+
+
+def start_app(db_config, port=8599, app_path=APP_PATH, startup_timeout=60):
+    """
+    Start `streamlit run` on the instrumented app as a subprocess and wait until it is healthy.
+
+    Parameters:
+    db_config (dict): Connection parameters passed to the app through TELLCO_DB_* variables
+    port (int): Port the Streamlit server listens on
+    app_path (str): Path of the app script to serve
+    startup_timeout (float): Seconds to wait for the server to report healthy
+
+    Returns:
+    subprocess.Popen: The server process
+    """
+    env = dict(os.environ)
+    env.update({
+        'TELLCO_DB_HOST': db_config['host'],
+        'TELLCO_DB_PORT': str(db_config['port']),
+        'TELLCO_DB_USER': db_config['user'],
+        'TELLCO_DB_PASSWORD': db_config['password'],
+        'TELLCO_DB_NAME': db_config['database'],
+    })
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', INSTRUMENTED_APP_PATH,
+         '--server.port', str(port),
+         '--server.headless', 'true',
+         '--server.fileWatcherType', 'none',
+         '--browser.gatherUsageStats', 'false',
+         '--', app_path],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Streamlit exited with code {process.returncode} during startup.")
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    stop_app(process)
+    raise RuntimeError(f"Streamlit did not become healthy within {startup_timeout} seconds.")
+
+
+def stop_app(process):
+    """Stop a Streamlit server started by start_app."""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+class SessionClient:
+    """
+    Minimal Streamlit browser client: one websocket session on a running server.
+
+    Parameters:
+    url (str): Websocket URL of the server, e.g. ws://localhost:8599/_stcore/stream
+    timeout (float): Timeout in seconds for a single page view
+    """
+
+    def __init__(self, url, timeout=60):
+        self.url = url
+        self.timeout = timeout
+        self.websocket = None
+        self.widget_states = {}
+        self.selectboxes = {}
+
+    async def connect(self):
+        self.websocket = await websockets.connect(self.url, max_size=None)
+        self.widget_states = {}
+        self.selectboxes = {}
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+            self.websocket = None
+
+    async def rerun(self):
+        """
+        Rerun the script with the current widget states and wait until it finishes.
+
+        Returns:
+        tuple: (number of queries executed, error) where error is True if the page
+            shows an exception or an st.error message
+        """
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        message.rerun_script.widget_states.widgets.extend(self.widget_states.values())
+        await self.websocket.send(message.SerializeToString())
+        return await asyncio.wait_for(self._read_run(), self.timeout)
+
+    async def _read_run(self):
+        queries = None
+        error = False
+        self.selectboxes = {}
+        while True:
+            message = ForwardMsg.FromString(await self.websocket.recv())
+            kind = message.WhichOneof('type')
+            if kind == 'script_finished':
+                if queries is None:
+                    raise RuntimeError("Script run finished without reporting its query count.")
+                return queries, error
+            if kind != 'delta' or message.delta.WhichOneof('type') != 'new_element':
+                continue
+            element = message.delta.new_element
+            element_type = element.WhichOneof('type')
+            if element_type == 'selectbox':
+                self.selectboxes[element.selectbox.label] = element.selectbox
+            elif element_type == 'exception':
+                error = True
+            elif element_type == 'alert' and element.alert.format == Alert.ERROR:
+                error = True
+            elif element_type == 'markdown' and element.markdown.body.startswith(QUERY_COUNT_PREFIX):
+                queries = int(element.markdown.body[len(QUERY_COUNT_PREFIX):])
+
+    async def select(self, label, option):
+        """Select an option of the selectbox with the given label and rerun the script."""
+        if label not in self.selectboxes:
+            raise ValueError(f"No selectbox labelled '{label}' in the app.")
+        selectbox = self.selectboxes[label]
+        if option not in selectbox.options:
+            raise ValueError(f"Selectbox '{label}' has no option '{option}'.")
+        self.widget_states[label] = WidgetState(id=selectbox.id, string_value=option)
+        return await self.rerun()
+
+
+async def simulate_session(session_id, pages, url, seed=42, timeout=60):
+    """
+    Simulate one analyst opening the dashboard and switching between sections and metrics.
+
+    Each page view is one script run on the server. It is a 'miss' when the run executed
+    at least one query and a 'hit' when every query was served from st.cache_data
+    (including runs that waited on another session computing the same query).
+    A failed page view (timeout, missing widget, broken connection) is recorded as an
+    error and the session reconnects for its next view.
+
+    Parameters:
+    session_id (int): Identifier of the session, also used to derive its random seed
+    pages (int): Number of page views after the initial load
+    url (str): Websocket URL of the Streamlit server
+    seed (int): Base random seed
+    timeout (float): Timeout in seconds for a single page view
+
+    Returns:
+    list: (latency in seconds, status, error, page) for each page view, status being
+        'hit', 'miss' or None when the view failed
+    """
+    rng = random.Random(seed + session_id)
+    client = SessionClient(url, timeout=timeout)
+    connected = False
+    section, metric = 'User Overview Analysis', None
+    results = []
+
+    async def view(page, *selection):
+        nonlocal connected
+        started = time.perf_counter()
+        queries, error = 0, False
+        try:
+            if not connected:
+                # (Re)open the session, then go back to the current section if needed
+                await client.close()
+                await client.connect()
+                connected = True
+                queries, error = await client.rerun()
+                if selection and selection[0] != SECTION_LABEL and page[0] != 'User Overview Analysis':
+                    section_queries, section_error = await client.select(SECTION_LABEL, page[0])
+                    queries, error = queries + section_queries, error or section_error
+            if selection:
+                view_queries, view_error = await client.select(*selection)
+                queries, error = queries + view_queries, error or view_error
+            status = 'miss' if queries else 'hit'
+        except Exception:
+            connected = False
+            status, error = None, True
+        results.append((time.perf_counter() - started, status, error, page))
+
+    await view((section, metric))
+
+    for _ in range(pages):
+        new_section = rng.choice(list(SECTIONS))
+        label, metrics = SECTIONS[new_section]
+        if new_section != section:
+            section, metric = new_section, metrics[0]
+            await view((section, metric), SECTION_LABEL, section)
+        elif label is not None:
+            metric = rng.choice(metrics)
+            await view((section, metric), label, metric)
+        else:
+            await view((section, metric))
+
+    await client.close()
+    return results
+
+
+def summarize_latencies(results, elapsed):
+    """
+    Summarize page view results into throughput and latency percentiles.
+
+    Parameters:
+    results (list): (latency in seconds, status, error, page) tuples, status being
+        'hit', 'miss' or None for failed views
+    elapsed (float): Wall-clock duration of the load test in seconds
+
+    Returns:
+    dict: Summary with 'pages', 'errors', 'throughput' (pages/s) and, for 'all',
+        'hit' and 'miss', the count and p50/p95/p99 latency in milliseconds
+    """
+    summary = {
+        'pages': len(results),
+        'errors': sum(1 for _, _, error, _ in results if error),
+        'throughput': len(results) / elapsed if elapsed > 0 else 0.0,
+    }
+    groups = {'all': [latency for latency, _, _, _ in results]}
+    for status in ['hit', 'miss']:
+        groups[status] = [latency for latency, s, _, _ in results if s == status]
+    for name, latencies in groups.items():
+        if latencies:
+            p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        else:
+            p50 = p95 = p99 = float('nan')
+        summary[name] = {'count': len(latencies), 'p50': p50, 'p95': p95, 'p99': p99}
+    return summary
+
+
+async def _run_sessions(sessions, pages, url, seed, timeout):
+    results = await asyncio.gather(*[simulate_session(i, pages, url, seed, timeout)
+                                     for i in range(sessions)])
+    return [r for session in results for r in session]
+
+
+def run_load_test(db_config, sessions=10, pages=20, seed=42, timeout=60, port=8599, app_path=APP_PATH):
+    """
+    Start the app with `streamlit run` against the given database and run concurrent
+    simulated sessions against it. Every run starts a fresh server, so the cache is cold.
+
+    Parameters:
+    db_config (dict): Connection parameters passed to the app through TELLCO_DB_* variables
+    sessions (int): Number of concurrent sessions
+    pages (int): Number of page views per session after the initial load
+    seed (int): Base random seed
+    timeout (float): Timeout in seconds for a single page view
+    port (int): Port of the Streamlit server
+    app_path (str): Path of the app script to serve
+
+    Returns:
+    dict: Summary as returned by summarize_latencies
+    """
+    process = start_app(db_config, port=port, app_path=app_path)
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(_run_sessions(sessions, pages, f"ws://localhost:{port}/_stcore/stream",
+                                            seed, timeout))
+        elapsed = time.perf_counter() - started
+    finally:
+        stop_app(process)
+
+    return summarize_latencies(results, elapsed)
+
+
+def print_summary(summary):
+    """Print a load test summary."""
+    print(f"Pages: {summary['pages']}  Errors: {summary['errors']}  "
+          f"Throughput: {summary['throughput']:.2f} pages/s")
+    for name in ['all', 'hit', 'miss']:
+        stats = summary[name]
+        print(f"{name:>5}: n={stats['count']:<6} p50={stats['p50']:.1f}ms "
+              f"p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the TellCo Streamlit dashboard.")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', default='5432')
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--password', default='postgres')
+    parser.add_argument('--database', default='tellco_load_test')
+    parser.add_argument('--seed-rows', type=int, default=0,
+                        help="Recreate xdr_data with this many synthetic rows before the test")
+    parser.add_argument('--seed-days', type=int, default=30,
+                        help="Days of history the synthetic rows are spread over")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[10],
+                        help="Number of concurrent sessions (several values run one test each)")
+    parser.add_argument('--pages', type=int, default=20, help="Page views per session")
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--app-port', type=int, default=8599, help="Port of the Streamlit server")
+    args = parser.parse_args()
+
+    db_config = {
+        'host': args.host,
+        'port': args.port,
+        'user': args.user,
+        'password': args.password,
+        'database': args.database
+    }
+    if args.seed_rows:
+        seed_xdr_data(db_config, rows=args.seed_rows, days=args.seed_days)
+
+    for sessions in args.sessions:
+        print(f"\n{sessions} concurrent sessions, {args.pages} page views each")
+        print_summary(run_load_test(db_config, sessions=sessions, pages=args.pages,
+                                    timeout=args.timeout, port=args.app_port))
+
+
+if __name__ == "__main__":
+    main()
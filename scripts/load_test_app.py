@@ -0,0 +1,12 @@
+# load_test_app.py
+# Streamlit entry point started by load_test.py: runs the app given as first argument
+# and reports how many queries each script run executed.
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.load_test import run_instrumented_app
+
+run_instrumented_app(sys.argv[1])
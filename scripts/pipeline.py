@@ -0,0 +1,292 @@
+# pipeline.py
+
+import hashlib
+import inspect
+import os
+
+import pandas as pd
+
+from scripts.byte_to_mb_conversion import convert_bytes_to_mb
+from scripts.db_connection import load_data
+from scripts.missing_values_handler import (
+    handle_missing_numerical,
+    handle_missing_text,
+)
+from scripts.outliers_handler import handle_outliers_numerical, handle_outliers_text
+
+
+class Stage:
+    """
+    A single step of the pipeline.
+
+    Parameters:
+    name (str): Unique name of the stage, used for dependencies and checkpoint files
+    func (callable): Function called as func(*upstream_outputs, **kwargs)
+    deps (list): Names of the stages whose outputs are passed to func, in order
+    kwargs (dict): Extra keyword arguments passed to func
+    fusable (bool): True if the stage can run straight after the stage before it,
+        on the same frame and without a checkpoint in between (e.g. convert_bytes_to_mb,
+        handle_missing_text)
+    checkpoint (bool): Whether the DataFrame returned by the stage is written to Parquet
+    """
+
+    def __init__(self, name, func, deps=None, kwargs=None, fusable=False, checkpoint=True):
+        self.name = name
+        self.func = func
+        self.deps = list(deps or [])
+        self.kwargs = dict(kwargs or {})
+        self.fusable = fusable
+        self.checkpoint = checkpoint
+
+    def signature(self):
+        """
+        Return a string describing the stage definition, used in checkpoint keys.
+        It includes the source of func, so editing a stage invalidates its checkpoints.
+        """
+        func_name = f"{getattr(self.func, '__module__', '')}.{getattr(self.func, '__qualname__', repr(self.func))}"
+        try:
+            source = hashlib.sha256(inspect.getsource(self.func).encode()).hexdigest()
+        except (OSError, TypeError):
+            source = func_name
+        kwargs = sorted((k, repr(v)) for k, v in self.kwargs.items())
+        return f"{self.name}|{func_name}|{source}|{kwargs}"
+
+
+def hash_dataframe(df):
+    """
+    Return a content hash of a DataFrame (values, index and column names).
+
+    Parameters:
+    df (pd.DataFrame): DataFrame to hash
+
+    Returns:
+    str: Hex digest identifying the DataFrame content
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr(list(df.dtypes.astype(str))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class Pipeline:
+    """
+    Run stages declared as a DAG, fusing chains of fusable stages so they run one
+    after another on the frame they share, and checkpointing the result of each
+    group of stages to local Parquet.
+
+    Checkpoints are keyed by a hash of the stage definition and the keys of its
+    inputs, so a stage is only rerun when its definition or one of its inputs changed.
+    Source stages (stages without deps) always run, and are keyed by the content
+    hash of the DataFrame they return.
+
+    Parameters:
+    checkpoint_dir (str): Directory where Parquet checkpoints are stored
+    """
+
+    def __init__(self, checkpoint_dir='checkpoints'):
+        self.checkpoint_dir = checkpoint_dir
+        self.stages = {}
+
+    def add_stage(self, name, func, deps=None, kwargs=None, fusable=False, checkpoint=True):
+        """Declare a stage and return the pipeline so calls can be chained."""
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined.")
+        self.stages[name] = Stage(name, func, deps, kwargs, fusable, checkpoint)
+        return self
+
+    def topological_order(self):
+        """
+        Return the stage names ordered so that every stage comes after its deps.
+        Ties are broken by declaration order.
+        """
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'.")
+
+        remaining = {name: set(stage.deps) for name, stage in self.stages.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle detected between stages: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def consumers(self):
+        """Return a mapping of stage name to the names of the stages that depend on it."""
+        consumers = {name: [] for name in self.stages}
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                consumers[dep].append(stage.name)
+        return consumers
+
+    def sinks(self):
+        """Return the names of the stages no other stage depends on."""
+        return [name for name, consumers in self.consumers().items() if not consumers]
+
+    def fused_groups(self, targets=None):
+        """
+        Group the stages into execution units.
+
+        A fusable stage is fused with the stage before it when that stage is also
+        fusable, has a single dependency, has no other consumer and is not one of
+        the requested targets (only the last stage of a group keeps its output).
+        Every other stage forms a group on its own.
+
+        Parameters:
+        targets (list): Names of the stages whose outputs are needed (default is the sinks)
+
+        Returns:
+        list: Lists of stage names, in execution order
+        """
+        targets = set(self.sinks() if targets is None else targets)
+        consumers = self.consumers()
+
+        groups = []
+        group_of = {}
+        for name in self.topological_order():
+            stage = self.stages[name]
+            if stage.fusable and len(stage.deps) == 1:
+                parent = self.stages[stage.deps[0]]
+                if (parent.fusable and len(parent.deps) == 1 and len(consumers[parent.name]) == 1
+                        and parent.name not in targets):
+                    group = group_of[parent.name]
+                    group.append(name)
+                    group_of[name] = group
+                    continue
+            group = [name]
+            groups.append(group)
+            group_of[name] = group
+        return groups
+
+    def _checkpoint_path(self, name, key):
+        return os.path.join(self.checkpoint_dir, f"{name}-{key[:16]}.parquet")
+
+    def _stage_key(self, stage, input_keys):
+        digest = hashlib.sha256(stage.signature().encode())
+        for key in input_keys:
+            digest.update(key.encode())
+        return digest.hexdigest()
+
+    def _run_fused(self, stages, df):
+        """
+        Apply a chain of fused stages to df, one after another. The stage functions
+        modify their input in place, so no copies are made between stages.
+        """
+        for stage in stages:
+            df = stage.func(df, **stage.kwargs)
+        return df
+
+    def run(self, targets=None):
+        """
+        Run the pipeline, reusing checkpoints for stages whose inputs did not change.
+
+        Stage functions modify their input in place, so an upstream output is copied
+        before being handed to a consumer, unless it is its last consumer and the
+        output is not one of the targets.
+
+        Parameters:
+        targets (list): Names of the stages whose outputs should be returned
+            (default is the stages no other stage depends on)
+
+        Returns:
+        dict: Mapping of target stage name to its output
+        """
+        targets = self.sinks() if targets is None else list(targets)
+        unknown = [name for name in targets if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown target stages: {unknown}")
+
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        outputs = {}
+        keys = {}
+        remaining_consumers = {name: len(consumers) for name, consumers in self.consumers().items()}
+
+        def take(dep):
+            remaining_consumers[dep] -= 1
+            output = outputs[dep]
+            if isinstance(output, pd.DataFrame) and (remaining_consumers[dep] > 0 or dep in targets):
+                return output.copy()
+            return output
+
+        for group in self.fused_groups(targets):
+            stages = [self.stages[name] for name in group]
+            head, tail = stages[0], stages[-1]
+
+            if not head.deps:
+                result = head.func(**head.kwargs)
+                if isinstance(result, pd.DataFrame):
+                    key = self._stage_key(head, [hash_dataframe(result)])
+                else:
+                    key = self._stage_key(head, [repr(result)])
+                outputs[head.name] = result
+                keys[head.name] = key
+                print(f"Stage '{head.name}' loaded.")
+                continue
+
+            key = self._stage_key(tail, [self._stage_key(s, []) for s in stages[:-1]] +
+                                  [keys[dep] for dep in head.deps])
+            path = self._checkpoint_path(tail.name, key)
+
+            if tail.checkpoint and os.path.exists(path):
+                for dep in head.deps:
+                    remaining_consumers[dep] -= 1
+                result = pd.read_parquet(path)
+                print(f"Stage '{tail.name}' restored from checkpoint.")
+            else:
+                upstream = [take(dep) for dep in head.deps]
+                if len(stages) > 1:
+                    result = self._run_fused(stages, upstream[0])
+                else:
+                    result = head.func(*upstream, **head.kwargs)
+                if tail.checkpoint and isinstance(result, pd.DataFrame):
+                    result.to_parquet(path)
+                print(f"Stage{'s' if len(group) > 1 else ''} {', '.join(group)} completed.")
+
+            for name in group:
+                keys[name] = key
+            outputs[tail.name] = result
+
+        return {name: outputs[name] for name in targets}
+
+
+def build_cleaning_pipeline(query, db_config, byte_columns, checkpoint_dir='checkpoints'):
+    """
+    Build the standard cleaning pipeline: load_data -> numerical imputation ->
+    numerical outlier capping -> text cleaning -> bytes to MB conversion.
+
+    The text and conversion stages are fused, so they run back to back on one frame
+    with a single checkpoint after the conversion.
+    Scoring, export_to_postgres and train_model are deliberately left out: scoring
+    lives in the notebooks, export_to_postgres needs connection arguments and
+    returns nothing, and train_model takes an X/y split rather than a DataFrame.
+    Add them on top with add_stage, depending on 'convert_bytes_to_mb'.
+
+    Parameters:
+    query (str): SQL query used to load the raw data
+    db_config (dict): Database configuration passed to load_data
+    byte_columns (list): Columns to convert from bytes to megabytes
+    checkpoint_dir (str): Directory where Parquet checkpoints are stored
+
+    Returns:
+    Pipeline: The configured pipeline
+    """
+    pipeline = Pipeline(checkpoint_dir=checkpoint_dir)
+    pipeline.add_stage('load_data', load_data, kwargs={'query': query, 'db_config': db_config})
+    pipeline.add_stage('handle_missing_numerical', handle_missing_numerical, deps=['load_data'])
+    pipeline.add_stage('handle_outliers_numerical', handle_outliers_numerical,
+                       deps=['handle_missing_numerical'])
+    pipeline.add_stage('handle_missing_text', handle_missing_text,
+                       deps=['handle_outliers_numerical'], fusable=True)
+    pipeline.add_stage('handle_outliers_text', handle_outliers_text,
+                       deps=['handle_missing_text'], fusable=True)
+    pipeline.add_stage('convert_bytes_to_mb', convert_bytes_to_mb,
+                       deps=['handle_outliers_text'], kwargs={'columns': byte_columns},
+                       fusable=True)
+    return pipeline
@@ -0,0 +1,346 @@
+# xdr_partitions.py
+
+import argparse
+from datetime import date, datetime
+
+import psycopg2
+from psycopg2 import sql
+
+PARENT_TABLE = 'xdr_data'
+PARTITION_KEY = 'Start'
+
+
+def month_bounds(day):
+    """
+    Return the first day of the month containing day and the first day of the next month.
+
+    Parameters:
+    day (date or datetime): Any day of the month
+
+    Returns:
+    tuple: (start, end) dates, end exclusive
+    """
+    start = date(day.year, day.month, 1)
+    end = date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+    return start, end
+
+
+def partition_name(day):
+    """Return the name of the monthly partition of xdr_data containing day."""
+    return f"{PARENT_TABLE}_{day.year:04d}_{day.month:02d}"
+
+
+def months_between(first, last):
+    """Return the first day of every month from first to last, inclusive."""
+    months = []
+    current, _ = month_bounds(first)
+    last = date(last.year, last.month, last.day)
+    while current <= last:
+        months.append(current)
+        current = month_bounds(current)[1]
+    return months
+
+
+def _connect(db_config):
+    return psycopg2.connect(
+        host=db_config['host'],
+        port=db_config['port'],
+        user=db_config['user'],
+        password=db_config['password'],
+        dbname=db_config['database']
+    )
+
+
+def create_partitioned_table(cursor, like_table):
+    """
+    Create xdr_data as a table partitioned by range of record start date.
+
+    Parameters:
+    cursor: psycopg2 cursor
+    like_table (str): Existing table to copy the columns from
+    """
+    cursor.execute(sql.SQL("CREATE TABLE {parent} (LIKE {like} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})").format(
+        parent=sql.Identifier(PARENT_TABLE),
+        like=sql.Identifier(like_table),
+        key=sql.Identifier(PARTITION_KEY)
+    ))
+    prepare_partitioned_table(cursor)
+
+
+def prepare_partitioned_table(cursor):
+    """
+    Create the start date index and the default partition.
+
+    The default partition only accepts rows without a start date (CHECK "Start" IS NULL),
+    so inserting a row for a month that has no partition yet fails instead of landing
+    in an unprunable partition. Because of that constraint, Postgres does not need to
+    scan the default partition when a monthly partition is created or attached.
+    Create monthly partitions ahead of the data with create_partition.
+    """
+    cursor.execute(sql.SQL("CREATE INDEX IF NOT EXISTS {index} ON {parent} ({key})").format(
+        index=sql.Identifier(f"{PARENT_TABLE}_start_idx"),
+        parent=sql.Identifier(PARENT_TABLE),
+        key=sql.Identifier(PARTITION_KEY)
+    ))
+    cursor.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} (CONSTRAINT {constraint} CHECK ({key} IS NULL)) DEFAULT").format(
+        name=sql.Identifier(f"{PARENT_TABLE}_default"),
+        parent=sql.Identifier(PARENT_TABLE),
+        constraint=sql.Identifier(f"{PARENT_TABLE}_default_null_start"),
+        key=sql.Identifier(PARTITION_KEY)
+    ))
+
+
+def create_partition(cursor, day):
+    """
+    Create the monthly partition of xdr_data containing day, if it does not exist.
+    Partitions must exist before rows for their month are inserted.
+
+    Parameters:
+    cursor: psycopg2 cursor
+    day (date or datetime): Any day of the month to create
+
+    Returns:
+    str: Name of the partition
+    """
+    start, end = month_bounds(day)
+    name = partition_name(start)
+    cursor.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} FOR VALUES FROM (%s) TO (%s)").format(
+        name=sql.Identifier(name),
+        parent=sql.Identifier(PARENT_TABLE)
+    ), (start, end))
+    return name
+
+
+def migrate_to_partitioned(db_config, drop_old=False, months_ahead=3):
+    """
+    Convert an existing, unpartitioned xdr_data table into a partitioned one.
+
+    The old table is renamed to xdr_data_unpartitioned, its "Start" column is cast to
+    TIMESTAMP if needed, and its rows are copied into monthly partitions.
+
+    Parameters:
+    db_config (dict): Database configuration
+    drop_old (bool): Drop xdr_data_unpartitioned once the rows are copied
+    months_ahead (int): Number of empty partitions to create after the last month of data
+    """
+    old_table = f"{PARENT_TABLE}_unpartitioned"
+    db_connection = _connect(db_config)
+    cursor = db_connection.cursor()
+
+    cursor.execute(sql.SQL("ALTER TABLE {parent} RENAME TO {old}").format(
+        parent=sql.Identifier(PARENT_TABLE),
+        old=sql.Identifier(old_table)
+    ))
+    cursor.execute("SELECT data_type FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+                   (old_table, PARTITION_KEY))
+    if cursor.fetchone()[0] != 'timestamp without time zone':
+        cursor.execute(sql.SQL("ALTER TABLE {old} ALTER COLUMN {key} TYPE TIMESTAMP USING {key}::timestamp").format(
+            old=sql.Identifier(old_table),
+            key=sql.Identifier(PARTITION_KEY)
+        ))
+
+    create_partitioned_table(cursor, like_table=old_table)
+
+    cursor.execute(sql.SQL("SELECT MIN({key}), MAX({key}) FROM {old}").format(
+        key=sql.Identifier(PARTITION_KEY),
+        old=sql.Identifier(old_table)
+    ))
+    first, last = cursor.fetchone()
+    if first is not None:
+        for month in months_between(first, last):
+            create_partition(cursor, month)
+        for _ in range(months_ahead):
+            last = month_bounds(last)[1]
+            create_partition(cursor, last)
+
+    cursor.execute(sql.SQL("INSERT INTO {parent} SELECT * FROM {old}").format(
+        parent=sql.Identifier(PARENT_TABLE),
+        old=sql.Identifier(old_table)
+    ))
+    if drop_old:
+        cursor.execute(sql.SQL("DROP TABLE {old}").format(old=sql.Identifier(old_table)))
+
+    db_connection.commit()
+    cursor.close()
+    db_connection.close()
+    print(f"Migrated {PARENT_TABLE} to a partitioned table.")
+
+
+def attach_partition(db_config, table, day):
+    """
+    Attach an already loaded table as the monthly partition of xdr_data containing day.
+
+    A matching CHECK constraint is added first so Postgres can skip scanning the
+    table while attaching it, and the default partition only holds rows without a start
+    date, so it is not scanned either. The table is renamed to the standard partition name.
+    If the month already has an empty partition (e.g. one created ahead by migrate),
+    it is dropped and replaced; if that partition holds rows, a ValueError is raised.
+
+    Parameters:
+    db_config (dict): Database configuration
+    table (str): Name of the table to attach, with the same columns as xdr_data
+    day (date or datetime): Any day of the month the table covers
+    """
+    start, end = month_bounds(day)
+    name = partition_name(start)
+    constraint = f"{name}_range"
+    db_connection = _connect(db_config)
+    cursor = db_connection.cursor()
+
+    # migrate and create make empty partitions ahead of the data; replace them
+    if name != table and name in [partition for partition, _ in _partitions(cursor)]:
+        cursor.execute(sql.SQL("SELECT EXISTS (SELECT 1 FROM {name})").format(name=sql.Identifier(name)))
+        if cursor.fetchone()[0]:
+            db_connection.close()
+            raise ValueError(f"Partition {name} already holds rows; run 'detach {start} --drop' "
+                             f"first to replace it with {table}.")
+        cursor.execute(sql.SQL("ALTER TABLE {parent} DETACH PARTITION {name}").format(
+            parent=sql.Identifier(PARENT_TABLE),
+            name=sql.Identifier(name)
+        ))
+        cursor.execute(sql.SQL("DROP TABLE {name}").format(name=sql.Identifier(name)))
+
+    cursor.execute(sql.SQL("ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({key} IS NOT NULL AND {key} >= %s AND {key} < %s)").format(
+        table=sql.Identifier(table),
+        constraint=sql.Identifier(constraint),
+        key=sql.Identifier(PARTITION_KEY)
+    ), (start, end))
+    cursor.execute(sql.SQL("ALTER TABLE {parent} ATTACH PARTITION {table} FOR VALUES FROM (%s) TO (%s)").format(
+        parent=sql.Identifier(PARENT_TABLE),
+        table=sql.Identifier(table)
+    ), (start, end))
+    cursor.execute(sql.SQL("ALTER TABLE {table} DROP CONSTRAINT {constraint}").format(
+        table=sql.Identifier(table),
+        constraint=sql.Identifier(constraint)
+    ))
+    if table != name:
+        cursor.execute(sql.SQL("ALTER TABLE {table} RENAME TO {name}").format(
+            table=sql.Identifier(table),
+            name=sql.Identifier(name)
+        ))
+
+    db_connection.commit()
+    cursor.close()
+    db_connection.close()
+    print(f"Attached {table} as {name}.")
+
+
+def detach_partition(db_config, day, drop=False):
+    """
+    Detach the monthly partition of xdr_data containing day.
+
+    Parameters:
+    db_config (dict): Database configuration
+    day (date or datetime): Any day of the month to detach
+    drop (bool): Drop the partition table after detaching it
+    """
+    name = partition_name(day)
+    db_connection = _connect(db_config)
+    cursor = db_connection.cursor()
+
+    cursor.execute(sql.SQL("ALTER TABLE {parent} DETACH PARTITION {name}").format(
+        parent=sql.Identifier(PARENT_TABLE),
+        name=sql.Identifier(name)
+    ))
+    if drop:
+        cursor.execute(sql.SQL("DROP TABLE {name}").format(name=sql.Identifier(name)))
+
+    db_connection.commit()
+    cursor.close()
+    db_connection.close()
+    print(f"Detached {name}{' and dropped it' if drop else ''}.")
+
+
+def _partitions(cursor):
+    cursor.execute("""
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+    JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+    WHERE parent.relname = %s
+    ORDER BY child.relname
+    """, (PARENT_TABLE,))
+    return cursor.fetchall()
+
+
+def list_partitions(db_config):
+    """
+    Return the partitions of xdr_data with their bounds.
+
+    Parameters:
+    db_config (dict): Database configuration
+
+    Returns:
+    list: (partition name, partition bound expression) tuples
+    """
+    db_connection = _connect(db_config)
+    cursor = db_connection.cursor()
+    partitions = _partitions(cursor)
+    cursor.close()
+    db_connection.close()
+    return partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the monthly partitions of xdr_data.")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', default='5432')
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--password', default='postgres')
+    parser.add_argument('--database', default='tellco_db')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate = subparsers.add_parser('migrate', help="Convert xdr_data into a partitioned table")
+    migrate.add_argument('--drop-old', action='store_true')
+    migrate.add_argument('--months-ahead', type=int, default=3,
+                         help="Empty partitions to create after the last month of data")
+
+    create = subparsers.add_parser('create', help="Create empty monthly partitions")
+    create.add_argument('first', help="First month, YYYY-MM-DD")
+    create.add_argument('last', nargs='?', help="Last month, YYYY-MM-DD (default: first)")
+
+    attach = subparsers.add_parser('attach', help="Attach a loaded table as a monthly partition")
+    attach.add_argument('table')
+    attach.add_argument('month', help="Any day of the month, YYYY-MM-DD")
+
+    detach = subparsers.add_parser('detach', help="Detach a monthly partition")
+    detach.add_argument('month', help="Any day of the month, YYYY-MM-DD")
+    detach.add_argument('--drop', action='store_true')
+
+    subparsers.add_parser('list', help="List the partitions of xdr_data")
+    args = parser.parse_args()
+
+    db_config = {
+        'host': args.host,
+        'port': args.port,
+        'user': args.user,
+        'password': args.password,
+        'database': args.database
+    }
+
+    def parse_day(value):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+
+    if args.command == 'migrate':
+        migrate_to_partitioned(db_config, drop_old=args.drop_old, months_ahead=args.months_ahead)
+    elif args.command == 'create':
+        first = parse_day(args.first)
+        last = parse_day(args.last) if args.last else first
+        db_connection = _connect(db_config)
+        cursor = db_connection.cursor()
+        for month in months_between(first, last):
+            print(f"Created {create_partition(cursor, month)}.")
+        db_connection.commit()
+        cursor.close()
+        db_connection.close()
+    elif args.command == 'attach':
+        attach_partition(db_config, args.table, parse_day(args.month))
+    elif args.command == 'detach':
+        detach_partition(db_config, parse_day(args.month), drop=args.drop)
+    elif args.command == 'list':
+        for name, bounds in list_partitions(db_config):
+            print(f"{name}: {bounds}")
+
+
+if __name__ == "__main__":
+    main()
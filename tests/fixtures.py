@@ -0,0 +1,27 @@
+from unittest.mock import MagicMock
+from datetime import date
+
+# Date bounds returned by fake_connection for the MIN/MAX("Start") query
+MIN_DATE = date(2019, 4, 1)
+MAX_DATE = date(2019, 4, 30)
+
+def fake_connection(queries=None):
+    """
+    Return a mock psycopg2 connection for app/app.py. Its cursor answers the date bounds
+    query and returns one row for any other query. Executed (query, params) pairs are
+    appended to queries when given.
+    """
+    cursor = MagicMock()
+
+    def execute(query, params=None):
+        if queries is not None:
+            queries.append((query, params))
+        if 'MIN("Start")' in query:
+            cursor.fetchall.return_value = [(MIN_DATE, MAX_DATE)]
+        else:
+            cursor.fetchall.return_value = [('33600000000', 1)]
+
+    cursor.execute.side_effect = execute
+    connection = MagicMock()
+    connection.cursor.return_value.__enter__.return_value = cursor
+    return connection
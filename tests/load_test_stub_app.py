@@ -0,0 +1,8 @@
+# Stand-in for app/app.py with the same widgets and no database, served by test_load_test.py
+import streamlit as st
+from scripts.load_test import SECTION_LABEL, SECTIONS
+
+section = st.sidebar.selectbox(SECTION_LABEL, list(SECTIONS))
+label, metrics = SECTIONS[section]
+if label is not None:
+    st.write(st.selectbox(label, metrics))
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+from datetime import date, timedelta
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from scripts.load_test import APP_PATH, SECTION_LABEL, SECTIONS
+from tests.fixtures import MAX_DATE, fake_connection
+
+# Number of data queries each section runs on a fresh cache
+SECTION_QUERIES = {
+    'User Overview Analysis': 6,
+    'User Engagement Analysis': 1,
+    'User Experience Analysis': 1,
+    'User Satisfaction Analysis': 1,
+}
+
+class TestAppDateRange(unittest.TestCase):
+
+    def setUp(self):
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        self.queries = []
+
+    def section_queries(self):
+        return [(query, params) for query, params in self.queries if 'MIN("Start")' not in query]
+
+    def test_section_queries_cover_every_section(self):
+        self.assertEqual(set(SECTION_QUERIES), set(SECTIONS))
+
+    @patch('psycopg2.connect')
+    def test_default_range_is_last_week(self, mock_connect):
+        mock_connect.return_value = fake_connection(self.queries)
+        at = AppTest.from_file(APP_PATH).run()
+        self.assertEqual(len(at.exception), 0)
+        queries = self.section_queries()
+        self.assertEqual(len(queries), SECTION_QUERIES[next(iter(SECTIONS))])
+        for query, params in queries:
+            self.assertIn('"Start" >= %(start)s AND "Start" < %(end)s', query)
+            self.assertEqual(params, {'start': MAX_DATE - timedelta(days=6),
+                                      'end': MAX_DATE + timedelta(days=1)})
+
+    @patch('psycopg2.connect')
+    def test_selected_range_reaches_every_section(self, mock_connect):
+        mock_connect.return_value = fake_connection(self.queries)
+        at = AppTest.from_file(APP_PATH).run()
+        at = at.date_input[0].set_value((date(2019, 4, 5), date(2019, 4, 10))).run()
+        for section in SECTIONS:
+            st.cache_data.clear()
+            self.queries.clear()
+            at = next(s for s in at.selectbox if s.label == SECTION_LABEL).select(section).run()
+            self.assertEqual(len(at.exception), 0)
+            queries = self.section_queries()
+            self.assertEqual(len(queries), SECTION_QUERIES[section])
+            for query, params in queries:
+                self.assertIn('"Start" >= %(start)s AND "Start" < %(end)s', query)
+                # End date is inclusive in the selector, exclusive in the query
+                self.assertEqual(params, {'start': date(2019, 4, 5), 'end': date(2019, 4, 11)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import patch
+import math
+import os
+import socket
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from scripts.load_test import (
+    APP_PATH,
+    SECTION_LABEL,
+    SECTIONS,
+    run_load_test,
+    seed_xdr_data,
+    summarize_latencies
+)
+from tests.fixtures import fake_connection
+
+STUB_APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load_test_stub_app.py')
+
+STUB_DB_CONFIG = {'host': 'localhost', 'port': '5432', 'user': 'stub', 'password': 'stub', 'database': 'stub'}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+class TestLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        st.cache_data.clear()
+        st.cache_resource.clear()
+
+    def test_summarize_latencies(self):
+        results = ([(0.1, 'miss', False, 'a'), (0.2, 'miss', True, 'b'), (0.3, None, True, 'a')]
+                   + [(0.01, 'hit', False, 'a')] * 7)
+        summary = summarize_latencies(results, elapsed=2.0)
+        self.assertEqual(summary['pages'], 10)
+        self.assertEqual(summary['errors'], 2)
+        self.assertAlmostEqual(summary['throughput'], 5.0)
+        self.assertEqual(summary['all']['count'], 10)
+        self.assertEqual(summary['hit']['count'], 7)
+        self.assertEqual(summary['miss']['count'], 2)
+        self.assertAlmostEqual(summary['hit']['p99'], 10.0)
+        self.assertAlmostEqual(summary['miss']['p50'], 150.0)
+
+    def test_summarize_latencies_without_hits(self):
+        summary = summarize_latencies([(0.5, 'miss', False, 'a')], elapsed=1.0)
+        self.assertEqual(summary['hit']['count'], 0)
+        self.assertTrue(math.isnan(summary['hit']['p50']))
+
+    @patch('psycopg2.connect')
+    def test_app_selectboxes_match_sections(self, mock_connect):
+        mock_connect.return_value = fake_connection()
+        at = AppTest.from_file(APP_PATH).run()
+        section_selectbox = next(s for s in at.selectbox if s.label == SECTION_LABEL)
+        self.assertEqual(list(section_selectbox.options), list(SECTIONS))
+        for section, (label, metrics) in SECTIONS.items():
+            at = next(s for s in at.selectbox if s.label == SECTION_LABEL).select(section).run()
+            if label is not None:
+                metric_selectbox = next(s for s in at.selectbox if s.label == label)
+                self.assertEqual(list(metric_selectbox.options), metrics)
+
+    def test_sessions_against_streamlit_server(self):
+        summary = run_load_test(STUB_DB_CONFIG, sessions=4, pages=5, port=free_port(),
+                                app_path=STUB_APP_PATH)
+        self.assertEqual(summary['pages'], 24)
+        self.assertEqual(summary['errors'], 0)
+        # The stub app runs no queries, so every view is served without a miss
+        self.assertEqual(summary['hit']['count'], 24)
+
+    def test_failed_views_are_recorded(self):
+        summary = run_load_test(STUB_DB_CONFIG, sessions=2, pages=3, timeout=0.0001,
+                                port=free_port(), app_path=STUB_APP_PATH)
+        self.assertEqual(summary['pages'], 8)
+        self.assertEqual(summary['errors'], 8)
+
+    @unittest.skipUnless(os.environ.get('TELLCO_TEST_DB_HOST'), "needs a Postgres database in TELLCO_TEST_DB_*")
+    def test_sessions_against_postgres(self):
+        db_config = {
+            'host': os.environ['TELLCO_TEST_DB_HOST'],
+            'port': os.environ.get('TELLCO_TEST_DB_PORT', '5432'),
+            'user': os.environ.get('TELLCO_TEST_DB_USER', 'postgres'),
+            'password': os.environ.get('TELLCO_TEST_DB_PASSWORD', 'postgres'),
+            'database': os.environ.get('TELLCO_TEST_DB_NAME', 'tellco_load_test')
+        }
+        seed_xdr_data(db_config, rows=5_000, days=14)
+        summary = run_load_test(db_config, sessions=4, pages=5, port=free_port())
+        self.assertEqual(summary['errors'], 0)
+        self.assertGreater(summary['miss']['count'], 0)
+        self.assertGreater(summary['hit']['count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import tempfile
+import pandas as pd
+from scripts.byte_to_mb_conversion import convert_bytes_to_mb
+from scripts.missing_values_handler import handle_missing_numerical, handle_missing_text
+from scripts.pipeline import Pipeline
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({
+            'Total DL (Bytes)': [1048576.0, None, 3145728.0, 4194304.0, 5242880.0],
+            'Handset Type': ['a', None, 'c', None, 'e']
+        })
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def build_pipeline(self, df):
+        def source():
+            return df.copy()
+
+        def track(func):
+            def wrapper(data, **kwargs):
+                self.calls.append(func.__name__)
+                return func(data, **kwargs)
+            wrapper.__qualname__ = func.__qualname__
+            return wrapper
+
+        pipeline = Pipeline(checkpoint_dir=self.tmp_dir.name)
+        pipeline.add_stage('source', source)
+        pipeline.add_stage('numerical', track(handle_missing_numerical), deps=['source'])
+        pipeline.add_stage('text', track(handle_missing_text), deps=['numerical'], fusable=True)
+        pipeline.add_stage('mb', track(convert_bytes_to_mb), deps=['text'],
+                           kwargs={'columns': ['Total DL (Bytes)']}, fusable=True)
+        return pipeline
+
+    def test_fused_groups(self):
+        pipeline = self.build_pipeline(self.df)
+        self.assertEqual(pipeline.fused_groups(), [['source'], ['numerical'], ['text', 'mb']])
+
+    def test_fused_run_matches_sequential(self):
+        result = self.build_pipeline(self.df).run(targets=['mb'])['mb']
+        expected = convert_bytes_to_mb(
+            handle_missing_text(handle_missing_numerical(self.df.copy())), ['Total DL (Bytes)'])
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_fused_stage_changing_dtype(self):
+        def to_numeric(df):
+            df['x'] = pd.to_numeric(df['x'])
+            return df
+
+        for values in (['1', '2', '3', '4.5'], ['1', '2', '3', None]):
+            df = pd.DataFrame({'x': values, 'Handset Type': ['a', None, 'c', 'd']})
+            pipeline = Pipeline(checkpoint_dir=self.tmp_dir.name)
+            pipeline.add_stage('source', lambda: df.copy())
+            pipeline.add_stage('numeric', to_numeric, deps=['source'], fusable=True)
+            pipeline.add_stage('text', handle_missing_text, deps=['numeric'], fusable=True)
+            self.assertEqual(pipeline.fused_groups(), [['source'], ['numeric', 'text']])
+            expected = handle_missing_text(to_numeric(df.copy()))
+            pd.testing.assert_frame_equal(pipeline.run()['text'], expected)
+
+    def test_rerun_uses_checkpoints(self):
+        self.build_pipeline(self.df).run()
+        self.calls.clear()
+        self.build_pipeline(self.df).run()
+        self.assertEqual(self.calls, [])
+
+    def test_changed_input_reruns(self):
+        self.build_pipeline(self.df).run()
+        self.calls.clear()
+        changed = self.df.copy()
+        changed.loc[0, 'Total DL (Bytes)'] = 2097152.0
+        result = self.build_pipeline(changed).run(targets=['mb'])['mb']
+        self.assertIn('handle_missing_numerical', self.calls)
+        self.assertAlmostEqual(result['Total DL (MB)'][0], 2.0)
+
+    def test_fan_out_gives_each_consumer_its_own_input(self):
+        pipeline = Pipeline(checkpoint_dir=self.tmp_dir.name)
+        pipeline.add_stage('source', lambda: self.df.copy())
+        pipeline.add_stage('mb', convert_bytes_to_mb, deps=['source'],
+                           kwargs={'columns': ['Total DL (Bytes)']})
+        pipeline.add_stage('imputed', handle_missing_numerical, deps=['source'])
+        outputs = pipeline.run(targets=['source', 'mb', 'imputed'])
+        self.assertEqual(list(outputs['imputed'].columns), ['Total DL (Bytes)', 'Handset Type'])
+        self.assertAlmostEqual(outputs['imputed']['Total DL (Bytes)'][0], 1048576.0)
+        self.assertAlmostEqual(outputs['mb']['Total DL (MB)'][0], 1.0)
+        pd.testing.assert_frame_equal(outputs['source'], self.df)
+
+    def test_multi_dependency_stage_is_not_fused(self):
+        def join(left, right):
+            return left.join(right, rsuffix='_right')
+
+        pipeline = Pipeline(checkpoint_dir=self.tmp_dir.name)
+        pipeline.add_stage('a', lambda: self.df[['Total DL (Bytes)']].copy())
+        pipeline.add_stage('b', lambda: self.df[['Handset Type']].copy())
+        pipeline.add_stage('j', join, deps=['a', 'b'], fusable=True)
+        pipeline.add_stage('k', handle_missing_text, deps=['j'], fusable=True)
+        self.assertEqual(pipeline.fused_groups(), [['a'], ['b'], ['j'], ['k']])
+        result = pipeline.run()['k']
+        self.assertEqual(result['Handset Type'][1], 'Unknown')
+
+    def test_fused_stage_requested_as_target(self):
+        pipeline = self.build_pipeline(self.df)
+        self.assertEqual(pipeline.fused_groups(targets=['text', 'mb']),
+                         [['source'], ['numerical'], ['text'], ['mb']])
+        outputs = pipeline.run(targets=['text', 'mb'])
+        self.assertIn('Total DL (Bytes)', outputs['text'].columns)
+        self.assertIn('Total DL (MB)', outputs['mb'].columns)
+        with self.assertRaises(ValueError):
+            pipeline.run(targets=['missing'])
+
+    def test_signature_includes_source(self):
+        first = Pipeline(checkpoint_dir=self.tmp_dir.name).add_stage(
+            'clean', handle_missing_text).stages['clean']
+        second = Pipeline(checkpoint_dir=self.tmp_dir.name).add_stage(
+            'clean', handle_missing_numerical).stages['clean']
+        self.assertIn(handle_missing_text.__qualname__, first.signature())
+        self.assertNotEqual(first.signature().split('|')[2], second.signature().split('|')[2])
+
+    def test_cycle_detection(self):
+        pipeline = Pipeline(checkpoint_dir=self.tmp_dir.name)
+        pipeline.add_stage('a', handle_missing_text, deps=['b'])
+        pipeline.add_stage('b', handle_missing_text, deps=['a'])
+        with self.assertRaises(ValueError):
+            pipeline.topological_order()
+
+
+if __name__ == '__main__':
+    unittest.main()
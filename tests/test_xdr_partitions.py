@@ -0,0 +1,90 @@
+import unittest
+import os
+from datetime import date, datetime
+import psycopg2
+from scripts.xdr_partitions import (
+    month_bounds,
+    partition_name,
+    months_between,
+    migrate_to_partitioned,
+    attach_partition,
+    detach_partition,
+    list_partitions
+)
+
+class TestXdrPartitions(unittest.TestCase):
+
+    def test_month_bounds(self):
+        self.assertEqual(month_bounds(date(2019, 4, 15)), (date(2019, 4, 1), date(2019, 5, 1)))
+        self.assertEqual(month_bounds(datetime(2019, 12, 31, 23, 59)), (date(2019, 12, 1), date(2020, 1, 1)))
+
+    def test_partition_name(self):
+        self.assertEqual(partition_name(date(2019, 4, 15)), 'xdr_data_2019_04')
+
+    def test_months_between(self):
+        months = months_between(datetime(2019, 11, 20, 8, 0), datetime(2020, 2, 1, 0, 0))
+        self.assertEqual(months, [date(2019, 11, 1), date(2019, 12, 1), date(2020, 1, 1), date(2020, 2, 1)])
+
+
+@unittest.skipUnless(os.environ.get('TELLCO_TEST_DB_HOST'), "needs a Postgres database in TELLCO_TEST_DB_*")
+class TestXdrPartitionsPostgres(unittest.TestCase):
+
+    def setUp(self):
+        self.db_config = {
+            'host': os.environ['TELLCO_TEST_DB_HOST'],
+            'port': os.environ.get('TELLCO_TEST_DB_PORT', '5432'),
+            'user': os.environ.get('TELLCO_TEST_DB_USER', 'postgres'),
+            'password': os.environ.get('TELLCO_TEST_DB_PASSWORD', 'postgres'),
+            'database': os.environ.get('TELLCO_TEST_DB_NAME', 'tellco_load_test')
+        }
+        self.connection = psycopg2.connect(
+            host=self.db_config['host'],
+            port=self.db_config['port'],
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            dbname=self.db_config['database']
+        )
+        self.connection.autocommit = True
+        self.cursor = self.connection.cursor()
+        self.cursor.execute('DROP TABLE IF EXISTS xdr_data, xdr_data_unpartitioned, june, april CASCADE')
+        self.cursor.execute('CREATE TABLE xdr_data ("Start" TEXT, "Dur. (ms)" DOUBLE PRECISION)')
+        self.cursor.execute("INSERT INTO xdr_data VALUES ('4/4/2019 12:01', 1), ('5/2/2019 08:30', 2), (NULL, 3)")
+        migrate_to_partitioned(self.db_config, drop_old=True)
+
+    def tearDown(self):
+        self.cursor.close()
+        self.connection.close()
+
+    def count(self, table):
+        self.cursor.execute(f'SELECT COUNT(*) FROM {table}')
+        return self.cursor.fetchone()[0]
+
+    def test_migrate_creates_partitions_ahead(self):
+        names = [name for name, _ in list_partitions(self.db_config)]
+        self.assertEqual(names, ['xdr_data_2019_04', 'xdr_data_2019_05', 'xdr_data_2019_06',
+                                 'xdr_data_2019_07', 'xdr_data_2019_08', 'xdr_data_default'])
+        self.assertEqual(self.count('xdr_data'), 3)
+        self.assertEqual(self.count('xdr_data_default'), 1)
+
+    def test_rows_without_partition_are_rejected(self):
+        with self.assertRaises(psycopg2.errors.CheckViolation):
+            self.cursor.execute("INSERT INTO xdr_data VALUES ('2020-01-15', 4)")
+
+    def test_attach_replaces_empty_partition(self):
+        self.cursor.execute('CREATE TABLE june (LIKE xdr_data)')
+        self.cursor.execute("INSERT INTO june VALUES ('2019-06-10', 5), ('2019-06-20', 6)")
+        attach_partition(self.db_config, 'june', date(2019, 6, 1))
+        self.assertEqual(self.count('xdr_data_2019_06'), 2)
+        self.assertEqual(self.count('xdr_data'), 5)
+
+    def test_attach_over_loaded_partition_fails(self):
+        self.cursor.execute('CREATE TABLE april (LIKE xdr_data)')
+        with self.assertRaises(ValueError):
+            attach_partition(self.db_config, 'april', date(2019, 4, 1))
+        detach_partition(self.db_config, date(2019, 4, 1), drop=True)
+        attach_partition(self.db_config, 'april', date(2019, 4, 1))
+        self.assertEqual(self.count('xdr_data'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()